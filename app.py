@@ -5,21 +5,74 @@ Use for Cloud Run deployment or local testing.
 DO NOT expose any API keys or secrets in the repo.
 """
 
+import io
 import os
-import tempfile
-from flask import Flask, request, jsonify
-from insightflow_core import SessionState, LongTermMemory, OrchestratorAgent
+from concurrent.futures import ProcessPoolExecutor
+from flask import Flask, Response, request, jsonify, send_file
+from insightflow_core import OrchestratorAgent, get_chart_status, warm_kpi_kernel
+
+try:
+    import orjson
+except ImportError:  # fall back to Flask's stdlib-json responses
+    orjson = None
 
 app = Flask(__name__)
 
-# Create a simple singleton orchestrator for demo
-SESSION = SessionState()
-LTM = LongTermMemory()
-ORCH = OrchestratorAgent(SESSION, LTM)
+
+def _json_response(payload):
+    """Serialize a response with orjson (native numpy scalars) when available."""
+    if orjson is None:
+        return jsonify(payload)
+    return Response(
+        orjson.dumps(
+            payload, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        ),
+        mimetype="application/json",
+    )
+
+# Concurrency settings for the analysis pool
+CONCURRENT_EXECUTION = {
+    "max_workers": os.cpu_count(),
+    "timeout_seconds": 60,
+    "fail_fast": True,
+}
+
+# Process pool so CPU-bound KPI work (pandas + matplotlib) runs in parallel
+# across cores instead of serializing on the Flask worker's GIL.
+# Each worker warms the JIT-compiled KPI kernel as it starts; warming in the
+# parent instead would initialize numba's thread pool before the fork, which
+# can deadlock the children.
+EXECUTOR = ProcessPoolExecutor(
+    max_workers=CONCURRENT_EXECUTION["max_workers"], initializer=warm_kpi_kernel
+)
+
+
+def _run_pipeline(data: bytes):
+    """Run one full pipeline in a worker process with fresh per-request state."""
+    orch = OrchestratorAgent()
+    return orch.process_file(io.BytesIO(data))
 
 @app.route("/health", methods=["GET"])
 def health():
-    return jsonify({"status": "ok", "name": "InsightFlow API"})
+    return _json_response({"status": "ok", "name": "InsightFlow API"})
+
+@app.route("/chart/<chart_id>", methods=["GET"])
+def chart(chart_id):
+    """Serve a rendered chart PNG.
+
+    202 while the background render is pending, 500 if it failed, 404 for
+    ids that were never issued.
+    """
+    if not chart_id.isalnum():
+        return jsonify({"error": "Invalid chart id"}), 400
+    status, detail = get_chart_status(chart_id)
+    if status == "ready":
+        return send_file(detail, mimetype="image/png")
+    if status == "pending":
+        return _json_response({"status": "pending"}), 202
+    if status == "failed":
+        return jsonify({"error": f"Chart render failed: {detail}"}), 500
+    return jsonify({"error": "Unknown chart id"}), 404
 
 @app.route("/analyze-file", methods=["POST"])
 def analyze_file():
@@ -30,12 +83,19 @@ def analyze_file():
     if 'file' not in request.files:
         return jsonify({"error": "Please upload a CSV file as 'file'"}), 400
     f = request.files['file']
-    # Save temp file
-    tmp = tempfile.NamedTemporaryFile(delete=False, suffix=".csv")
-    f.save(tmp.name)
-    tmp.flush()
     try:
-        package = ORCH.process_file(tmp.name)
+        # Hand the upload bytes straight to the pipeline — no temp-file
+        # round-trip through the filesystem.
+        future = EXECUTOR.submit(_run_pipeline, f.read())
+        try:
+            package = future.result(timeout=CONCURRENT_EXECUTION["timeout_seconds"])
+        except TimeoutError:
+            # str(TimeoutError()) is empty — spell out what happened.
+            future.cancel()
+            return jsonify({
+                "error": "Analysis timed out after "
+                         f"{CONCURRENT_EXECUTION['timeout_seconds']}s"
+            }), 504
         # Remove dataframes / binary if large; keep summary
         result = {
             "profile": package["profile"],
@@ -43,14 +103,9 @@ def analyze_file():
             "narrative": package["narrative"],
             "charts": package.get("charts", {}),
         }
-        return jsonify(result)
+        return _json_response(result)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
-    finally:
-        try:
-            os.unlink(tmp.name)
-        except Exception:
-            pass
 
 if __name__ == "__main__":
     # For local testing
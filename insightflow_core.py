@@ -15,14 +15,49 @@ This script demonstrates:
 Safe to run locally or in Kaggle.
 """
 
+import gc
 import os
+import io
+import re
+import glob
 import json
+import time
+import hashlib
 import logging
+import sqlite3
+import uuid
+from itertools import islice
+from logging.handlers import RotatingFileHandler
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any
 
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
+from pandas.api.types import is_datetime64_any_dtype, is_integer_dtype
+
+from llm_tools import compact_context
+
+try:
+    # SIMD-accelerated content hashing for the result cache
+    from blake3 import blake3 as _content_hash
+except ImportError:  # stdlib fallback
+    from hashlib import blake2b as _content_hash
+
+try:
+    import orjson
+
+    def _json_dumps(obj) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY)
+
+    _json_loads = orjson.loads
+except ImportError:  # stdlib fallback
+    def _json_dumps(obj) -> bytes:
+        return json.dumps(obj).encode()
+
+    _json_loads = json.loads
+
+# matplotlib is imported lazily inside the chart path — it costs hundreds of
+# milliseconds to import and most callers never render a chart.
 
 
 # ---------------------------------------------------------
@@ -32,9 +67,16 @@ LOG_DIR = "insightflow_logs"
 os.makedirs(LOG_DIR, exist_ok=True)
 
 logging.basicConfig(
-    filename=os.path.join(LOG_DIR, "insightflow.log"),
     level=logging.INFO,
-    format="%(asctime)s — %(levelname)s — %(message)s"
+    format="%(asctime)s — %(levelname)s — %(message)s",
+    handlers=[
+        # Rotate so the log cannot grow unboundedly in a long-running worker
+        RotatingFileHandler(
+            os.path.join(LOG_DIR, "insightflow.log"),
+            maxBytes=5 * 1024 * 1024,
+            backupCount=3,
+        )
+    ],
 )
 
 logger = logging.getLogger("InsightFlow")
@@ -54,30 +96,59 @@ class SessionState:
     def get(self, key: str, default=None):
         return self.storage.get(key, default)
 
+    def consume(self, key: str, default=None):
+        """Return and remove a value so heavy payloads are released early."""
+        return self.storage.pop(key, default)
+
+    def __del__(self):
+        self.storage.clear()
+
 
 class LongTermMemory:
-    """File-backed long-term memory for user preferences, patterns."""
-    def __init__(self, filename="memory_bank.json"):
-        self.filename = filename
-        if not os.path.exists(filename):
-            with open(filename, "w") as f:
-                json.dump({}, f)
-        self._load()
+    """SQLite-backed long-term memory for user preferences, patterns.
+
+    WAL mode lets concurrent workers read and write without blocking each
+    other, and each set() is an O(1) upsert instead of rewriting a whole
+    JSON file per call.
+    """
 
-    def _load(self):
-        with open(self.filename, "r") as f:
-            self.mem = json.load(f)
+    LEGACY_JSON = "memory_bank.json"
 
-    def save(self):
-        with open(self.filename, "w") as f:
-            json.dump(self.mem, f, indent=2)
+    def __init__(self, filename="memory_bank.db"):
+        self.filename = filename
+        self.conn = sqlite3.connect(
+            filename, isolation_level=None, check_same_thread=False
+        )
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS kv (k TEXT PRIMARY KEY, v BLOB)")
+        self._migrate_legacy_json()
+
+    def _migrate_legacy_json(self):
+        """One-shot import of the old memory_bank.json, if one is lying around."""
+        if not os.path.exists(self.LEGACY_JSON):
+            return
+        try:
+            with open(self.LEGACY_JSON, "r") as f:
+                legacy = json.load(f)
+            for key, value in legacy.items():
+                self.set(key, value)
+            os.replace(self.LEGACY_JSON, self.LEGACY_JSON + ".migrated")
+            logger.info("Migrated legacy memory bank into %s", self.filename)
+        except Exception as e:
+            logger.warning("Could not migrate legacy memory bank: %s", e)
 
     def get(self, key, default=None):
-        return self.mem.get(key, default)
+        row = self.conn.execute("SELECT v FROM kv WHERE k=?", (key,)).fetchone()
+        return _json_loads(row[0]) if row else default
 
     def set(self, key, value):
-        self.mem[key] = value
-        self.save()
+        self.conn.execute(
+            "INSERT OR REPLACE INTO kv (k, v) VALUES (?, ?)", (key, _json_dumps(value))
+        )
+
+    def delete(self, key):
+        self.conn.execute("DELETE FROM kv WHERE k=?", (key,))
 
 
 # ---------------------------------------------------------
@@ -88,29 +159,61 @@ class BaseAgent:
         self.session = session
         self.memory = memory
 
-    def log(self, message: str):
-        logger.info(f"[{self.__class__.__name__}] {message}")
+    def log(self, message: str, *args):
+        # Deferred %-formatting: no string is built unless INFO is enabled.
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("[%s] " + message, self.__class__.__name__, *args)
 
 
 # ---------------------------------------------------------
 # Data Intake & Validation Agent
 # ---------------------------------------------------------
+def _rewind(source):
+    """Reset a file-like source between reads; no-op for paths."""
+    if hasattr(source, "seek"):
+        source.seek(0)
+
+
+# Compiled once at import; runs of whitespace collapse to one underscore.
+_COLNAME_RE = re.compile(r"\s+")
+
+
+def _normalize_columns(columns) -> pd.Index:
+    """Clean column names in a single vectorized pass."""
+    return pd.Index(columns).str.strip().str.lower().str.replace(_COLNAME_RE, "_", regex=True)
+
+
 class DataIntakeAgent(BaseAgent):
-    def load_and_profile_csv(self, filepath: str) -> Dict[str, Any]:
-        self.log(f"Loading CSV from {filepath}")
+    # Below this size the Arrow reader's thread-pool overhead is not worth it.
+    LARGE_FILE_BYTES = 16 << 20
+
+    # How many column dtypes the profile carries; num_cols still reports the
+    # full width, and nothing downstream consumes a 50k-entry dtype dict.
+    PROFILE_DTYPE_SAMPLE = 50
+
+    def load_and_profile_csv(self, source, columns_of_interest=None) -> Dict[str, Any]:
+        """Load and profile a CSV from a path or any buffer pd.read_csv accepts.
+
+        When ``columns_of_interest`` is given, only the matching columns are
+        parsed (via usecols); the profile still reports the full header from
+        a zero-row peek, so wide files cost parse time and memory only for
+        the columns downstream agents actually use.
+        """
+        self.log("Loading CSV from %s", source)
         try:
-            df = pd.read_csv(filepath)
+            df, all_columns = self._read_csv(source, columns_of_interest)
         except Exception as e:
             raise ValueError(f"Error reading CSV: {e}")
 
-        # Clean column names
-        df.columns = [c.strip().lower().replace(" ", "_") for c in df.columns]
+        df.columns = _normalize_columns(df.columns)
 
         profile = {
             "num_rows": len(df),
-            "num_cols": len(df.columns),
-            "columns": list(df.columns),
-            "dtypes": df.dtypes.astype(str).to_dict()
+            "num_cols": len(all_columns),
+            "columns": all_columns,
+            "dtypes": dict(
+                islice(zip(df.columns, map(str, df.dtypes)), self.PROFILE_DTYPE_SAMPLE)
+            )
         }
 
         self.session.set("dataframe", df)
@@ -119,11 +222,366 @@ class DataIntakeAgent(BaseAgent):
         self.log("Dataset successfully profiled.")
         return profile
 
+    def _read_csv(self, source, columns_of_interest=None):
+        """Read a CSV with the multi-threaded PyArrow engine.
+
+        Accepts a filesystem path or a seekable buffer. A zero-row peek
+        yields the full header (for profiling and the schema-cache key); if
+        ``columns_of_interest`` is given, only the matching raw columns are
+        parsed. The inferred schema is cached in long-term memory keyed by a
+        hash of the header, so repeat uploads with the same columns skip
+        type inference. Falls back to the default C engine if PyArrow is
+        missing or cannot parse the file.
+
+        Returns ``(df, all_columns)`` where ``all_columns`` is the full
+        normalized header.
+        """
+        try:
+            header = pd.read_csv(source, nrows=0)
+            normalized = _normalize_columns(header.columns)
+            all_columns = list(normalized)
+
+            usecols = None
+            if columns_of_interest:
+                # Fall back to a full read when nothing matches, so intake
+                # still profiles arbitrary datasets.
+                usecols = [
+                    raw for raw, norm in zip(header.columns, normalized)
+                    if norm in columns_of_interest
+                ] or None
+
+            schema_key = "schema:" + hashlib.blake2b(
+                "|".join(header.columns).encode(), digest_size=16
+            ).hexdigest()
+
+            if self._source_size(source) >= self.LARGE_FILE_BYTES:
+                tbl = self._read_arrow(source, usecols)
+                if tbl is not None:
+                    tbl = tbl.rename_columns(list(_normalize_columns(tbl.column_names)))
+                    # Keep the Arrow table around so analytics can reduce the
+                    # column buffers directly, without a pandas round-trip.
+                    self.session.set("arrow_table", tbl)
+                    return tbl.to_pandas(types_mapper=pd.ArrowDtype), all_columns
+
+            cached = self.memory.get(schema_key)
+            if cached:
+                if usecols is not None:
+                    cached = {k: v for k, v in cached.items() if k in set(usecols)}
+                try:
+                    _rewind(source)
+                    return pd.read_csv(
+                        source,
+                        engine="pyarrow",
+                        dtype_backend="pyarrow",
+                        dtype=cached or None,
+                        usecols=usecols,
+                    ), all_columns
+                except Exception as e:
+                    self.log("Cached schema no longer fits, re-inferring: %s", e)
+
+            _rewind(source)
+            df = pd.read_csv(
+                source, engine="pyarrow", dtype_backend="pyarrow", usecols=usecols
+            )
+            self.memory.set(schema_key, dict(zip(df.columns, map(str, df.dtypes))))
+            return df, all_columns
+        except Exception as e:
+            self.log("PyArrow engine unavailable, using C engine: %s", e)
+            _rewind(source)
+            df = pd.read_csv(source)
+            return df, list(_normalize_columns(df.columns))
+
+    @staticmethod
+    def _source_size(source) -> int:
+        if hasattr(source, "seek"):
+            size = source.seek(0, os.SEEK_END)
+            source.seek(0)
+            return size
+        try:
+            return os.path.getsize(source)
+        except OSError:
+            return 0
+
+    def _read_arrow(self, source, usecols):
+        """Multi-threaded Arrow-native parse for large files.
+
+        Paths are memory-mapped so parse blocks stream straight from the
+        page cache; one 8 MB block is decoded per core. Returns None on any
+        failure so callers drop down to the pandas readers.
+        """
+        try:
+            import pyarrow as pa
+            import pyarrow.csv as pacsv
+        except ImportError:
+            return None
+        try:
+            if hasattr(source, "read"):
+                _rewind(source)
+                src = source
+            else:
+                src = pa.memory_map(source, "r")
+            return pacsv.read_csv(
+                src,
+                read_options=pacsv.ReadOptions(use_threads=True, block_size=8 << 20),
+                convert_options=pacsv.ConvertOptions(include_columns=usecols)
+                if usecols
+                else None,
+            )
+        except Exception as e:
+            self.log("Arrow-native CSV reader failed: %s", e)
+            return None
+
 
 # ---------------------------------------------------------
 # Analytics & KPI Agent
 # ---------------------------------------------------------
+# Background chart renders: the KPI JSON returns immediately and clients
+# poll /chart/<id> for the PNG once it lands on disk.
+CHART_POOL = ThreadPoolExecutor(max_workers=2)
+
+# Chart artifacts older than this are swept on the next render. The result
+# cache is count-based with no TTL, so an entry can outlive its chart files;
+# cache hits re-check the files on disk and recompute when they are gone.
+CHART_TTL_SECONDS = 24 * 3600
+
+
+def _chart_file(chart_id: str, ext: str = "png") -> str:
+    return os.path.abspath(os.path.join(LOG_DIR, f"chart_{chart_id}.{ext}"))
+
+
+def get_chart_status(chart_id: str):
+    """Classify a chart id for serving.
+
+    Returns ``("ready", path)``, ``("failed", message)``, ``("pending",
+    None)`` while the render is queued, or ``("unknown", None)`` for ids
+    that were never issued.
+    """
+    path = _chart_file(chart_id)
+    if os.path.exists(path):
+        return "ready", path
+    failed = _chart_file(chart_id, "failed")
+    if os.path.exists(failed):
+        try:
+            with open(failed, "r") as f:
+                return "failed", f.read()
+        except OSError:
+            return "failed", ""
+    if os.path.exists(_chart_file(chart_id, "pending")):
+        return "pending", None
+    return "unknown", None
+
+
+def _remove_chart_artifacts(chart_id: str):
+    """Delete every on-disk trace of a chart id."""
+    for ext in ("png", "pending", "failed"):
+        try:
+            os.remove(_chart_file(chart_id, ext))
+        except OSError:
+            pass
+
+
+def _sweep_stale_charts(now: float = None):
+    """Remove chart artifacts older than the TTL so disk use stays bounded."""
+    cutoff = (now if now is not None else time.time()) - CHART_TTL_SECONDS
+    for path in glob.glob(os.path.join(LOG_DIR, "chart_*")):
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+        except OSError:
+            pass
+
+
+def _render_chart(monthly, chart_id: str) -> bool:
+    """Draw the monthly revenue figure and write it atomically to disk.
+
+    Returns True on success. Failures are logged and recorded in a .failed
+    sentinel so /chart/<id> reports them instead of pending forever.
+    """
+    try:
+        import matplotlib
+        matplotlib.use("Agg", force=False)
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+        fig = Figure(figsize=(7, 4))
+        try:
+            ax = fig.add_subplot()
+            ax.plot(monthly.index, monthly.values)
+            ax.set_title("Monthly Revenue Trend")
+            ax.set_xlabel("Month")
+            ax.set_ylabel("Revenue")
+            fig.tight_layout()
+
+            buf = io.BytesIO()
+            FigureCanvasAgg(fig).print_png(buf)
+        finally:
+            # Release artists deterministically even if the render fails;
+            # there is no pyplot registry holding the figure alive either way.
+            fig.clear()
+
+        # Write-then-rename so /chart/<id> never serves a half-written PNG.
+        path = _chart_file(chart_id)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(buf.getvalue())
+        os.replace(tmp_path, path)
+        return True
+    except Exception as e:
+        logger.warning("[AnalyticsAgent] Error rendering chart %s: %s", chart_id, e)
+        try:
+            with open(_chart_file(chart_id, "failed"), "w") as f:
+                f.write(str(e))
+        except OSError:
+            pass
+        return False
+    finally:
+        try:
+            os.remove(_chart_file(chart_id, "pending"))
+        except OSError:
+            pass
+
+
+# (column, aggregation, KPI name) for e-commerce style data
+_KPI_SPEC = (
+    ("revenue", "sum", "total_revenue"),
+    ("order_id", "nunique", "total_orders"),
+    ("customer_id", "nunique", "unique_customers"),
+)
+
+try:
+    import polars as pl
+except ImportError:  # polars is optional; pandas/numba paths cover everything
+    pl = None
+
+# Below this the pl.from_pandas conversion overhead outweighs the parallel
+# Rust reductions.
+POLARS_THRESHOLD_ROWS = 200_000
+
+try:
+    from numba import njit, prange
+
+    @njit(cache=True, parallel=True)
+    def _kpi_kernel(revenue, order_id, customer_id):
+        """One fused pass: parallel revenue sum + set-based distinct counts."""
+        total = 0.0
+        for i in prange(revenue.shape[0]):
+            total += revenue[i]
+        orders = set()
+        for i in range(order_id.shape[0]):
+            orders.add(order_id[i])
+        customers = set()
+        for i in range(customer_id.shape[0]):
+            customers.add(customer_id[i])
+        return total, len(orders), len(customers)
+except ImportError:  # numba is optional; pandas path below covers everything
+    _kpi_kernel = None
+
+
+def warm_kpi_kernel():
+    """Trigger numba JIT compilation ahead of the first real request."""
+    if _kpi_kernel is not None:
+        one = np.zeros(1, dtype=np.int64)
+        _kpi_kernel(np.zeros(1), one, one)
+
+
+def _numba_kpis(df):
+    """Compiled fused reduction over the three KPI columns.
+
+    Returns None when numba is unavailable, a KPI column is missing, the
+    revenue column is not numeric, or an ID column is not integer-dtyped —
+    callers then take the pandas path. The ID dtype check matters: casting
+    float IDs to int64 would truncate them and merge distinct values.
+    """
+    if _kpi_kernel is None:
+        return None
+    if not all(col in df.columns for col, _, _ in _KPI_SPEC):
+        return None
+    if not (is_integer_dtype(df["order_id"]) and is_integer_dtype(df["customer_id"])):
+        return None
+    try:
+        revenue = df["revenue"].to_numpy(dtype=np.float64)
+        order_id = df["order_id"].to_numpy(dtype=np.int64)
+        customer_id = df["customer_id"].to_numpy(dtype=np.int64)
+    except (TypeError, ValueError):
+        return None
+    total, orders, customers = _kpi_kernel(revenue, order_id, customer_id)
+    return {
+        "total_revenue": float(total),
+        "total_orders": int(orders),
+        "unique_customers": int(customers),
+    }
+
+
+def _arrow_kpis(tbl) -> Dict[str, Any]:
+    """Reduce the Arrow table's column buffers directly — no pandas dispatch."""
+    import pyarrow.compute as pc
+
+    names = set(tbl.column_names)
+    kpis = {}
+    for col, op, name in _KPI_SPEC:
+        if col not in names:
+            continue
+        if op == "sum":
+            kpis[name] = float(pc.sum(tbl[col]).as_py() or 0)
+        else:
+            kpis[name] = int(pc.count_distinct(tbl[col]).as_py())
+    return kpis
+
+
+def _polars_kpis(df):
+    """Parallel Rust reductions via Polars for large frames.
+
+    Polars runs sum/n_unique on all cores and hits its sorted-key fast path
+    when keys are ordered. Returns None below the row threshold or when
+    Polars is unavailable — callers then take the numba/pandas paths.
+    """
+    if pl is None or len(df) <= POLARS_THRESHOLD_ROWS:
+        return None
+    cols = [col for col, _, _ in _KPI_SPEC if col in df.columns]
+    if not cols:
+        return None
+    try:
+        res = pl.from_pandas(df[cols], rechunk=False).select(
+            pl.col(col).sum().alias(name) if op == "sum"
+            else pl.col(col).n_unique().alias(name)
+            for col, op, name in _KPI_SPEC
+            if col in df.columns
+        )
+    except Exception:
+        return None
+    row = res.row(0, named=True)
+    return {
+        name: float(row[name]) if op == "sum" else int(row[name])
+        for col, op, name in _KPI_SPEC
+        if col in df.columns
+    }
+
+
+def _aggregate_kpis(df) -> Dict[str, Any]:
+    """Run all column reductions as one fused pass instead of one scan each."""
+    kpis = _polars_kpis(df)
+    if kpis is not None:
+        return kpis
+
+    kpis = _numba_kpis(df)
+    if kpis is not None:
+        return kpis
+
+    spec = {col: op for col, op, _ in _KPI_SPEC if col in df.columns}
+    if not spec:
+        return {}
+    res = df.agg(spec)
+    return {
+        name: float(res[col]) if op == "sum" else int(res[col])
+        for col, op, name in _KPI_SPEC
+        if col in spec
+    }
+
+
 class AnalyticsAgent(BaseAgent):
+    # Everything compute_kpis ever touches; intake only parses these columns.
+    REQUIRED_COLUMNS = frozenset(col for col, _, _ in _KPI_SPEC) | {"date"}
+
     def compute_kpis(self) -> Dict[str, Any]:
         df = self.session.get("dataframe")
         if df is None:
@@ -131,35 +589,22 @@ class AnalyticsAgent(BaseAgent):
 
         self.log("Computing KPIs...")
 
-        # Basic KPIs (for e-commerce style data)
+        # The monthly aggregation is cheap; the matplotlib render it feeds is
+        # not, so the render goes to the background pool and the response
+        # carries a chart id to poll instead of waiting on the PNG.
         kpis = {}
-        if "revenue" in df.columns:
-            kpis["total_revenue"] = float(df["revenue"].sum())
-        if "order_id" in df.columns:
-            kpis["total_orders"] = int(df["order_id"].nunique())
-        if "customer_id" in df.columns:
-            kpis["unique_customers"] = int(df["customer_id"].nunique())
-
-        # Monthly revenue plot if possible
         charts = {}
         if "date" in df.columns and "revenue" in df.columns:
             try:
-                df["date"] = pd.to_datetime(df["date"])
-                monthly = df.groupby(df["date"].dt.to_period("M"))["revenue"].sum()
-                plt.figure(figsize=(7, 4))
-                monthly.index = monthly.index.to_timestamp()
-                plt.plot(monthly.index, monthly.values)
-                plt.title("Monthly Revenue Trend")
-                plt.xlabel("Month")
-                plt.ylabel("Revenue")
-                plt.tight_layout()
-
-                chart_path = os.path.join(LOG_DIR, "monthly_rerevenue.png")
-                plt.savefig(chart_path)
-                charts["monthly_revenue"] = chart_path
-                plt.close()
+                charts["monthly_revenue"] = self._plot_monthly_revenue(df)
             except Exception as e:
-                self.log(f"Error generating plot: {e}")
+                # Not fail-fast: a failed plot must not abort KPI compute.
+                self.log("Error computing %s: %s", "chart", e)
+
+        # KPI errors propagate to the caller (and the API's 500 handler);
+        # only the chart is best-effort.
+        tbl = self.session.get("arrow_table")
+        kpis.update(_arrow_kpis(tbl) if tbl is not None else _aggregate_kpis(df))
 
         self.session.set("kpis", kpis)
         self.session.set("charts", charts)
@@ -167,6 +612,28 @@ class AnalyticsAgent(BaseAgent):
         self.log("KPIs computed.")
         return {"kpis": kpis, "charts": charts}
 
+    def _plot_monthly_revenue(self, df) -> Dict[str, Any]:
+        """Aggregate monthly revenue and queue the render off the critical path."""
+        # Arrow date columns also report datetime-like, but resample needs a
+        # real DatetimeIndex, so require a numpy datetime64 dtype here.
+        if not (is_datetime64_any_dtype(df["date"]) and isinstance(df["date"].dtype, np.dtype)):
+            # cache=True deduplicates repeated date strings before parsing
+            df["date"] = pd.to_datetime(df["date"], format="ISO8601", cache=True)
+        # Single C-level bucketing pass; no Period round-trip needed
+        monthly = df.set_index("date")["revenue"].resample("MS").sum()
+
+        _sweep_stale_charts()
+
+        chart_id = uuid.uuid4().hex
+        # Marker distinguishes a queued id from one that never existed; the
+        # render worker replaces it with the PNG or a failure sentinel.
+        with open(_chart_file(chart_id, "pending"), "w"):
+            pass
+        future = CHART_POOL.submit(_render_chart, monthly, chart_id)
+        # The orchestrator holds the result cache until this resolves.
+        self.session.set("chart_future", future)
+        return {"chart_id": chart_id, "status": "pending", "url": f"/chart/{chart_id}"}
+
 
 # ---------------------------------------------------------
 # Insight Writer Agent
@@ -176,6 +643,11 @@ class InsightWriterAgent(BaseAgent):
         kpis = self.session.get("kpis", {})
         profile = self.session.get("profile", {})
 
+        # Bound the context destined for the LLM: wide schemas are truncated
+        # and paged into long-term memory rather than inflating the prompt.
+        llm_context = compact_context(profile, kpis, memory=self.memory)
+        self.session.set("llm_context", llm_context)
+
         # Deterministic summary (fallback)
         summary = [
             "Executive Summary:",
@@ -203,15 +675,49 @@ class InsightWriterAgent(BaseAgent):
 # Orchestrator Agent
 # ---------------------------------------------------------
 class OrchestratorAgent(BaseAgent):
-    def process_file(self, filepath: str) -> Dict[str, Any]:
+    def __init__(self, memory: LongTermMemory = None):
+        # No shared session: each process_file call gets its own SessionState
+        # so concurrent pipelines never contend on the same storage dict.
+        super().__init__(SessionState(), memory if memory is not None else LongTermMemory())
+
+    # Most-recent pipeline results kept in long-term memory
+    CACHE_LIMIT = 32
+
+    def process_file(self, source) -> Dict[str, Any]:
+        """Run the full pipeline on a CSV path or file-like buffer.
+
+        Results are cached in long-term memory keyed by a hash of the CSV
+        bytes, so re-uploading an identical file skips the parse, KPI, and
+        chart work entirely.
+        """
+        self.session = SessionState()
         self.log("Starting pipeline...")
 
+        data = self._read_bytes(source)
+        cache_key = "cache:" + _content_hash(data).hexdigest()
+        cached = self.memory.get(cache_key)
+        if cached is not None:
+            cached = self._refresh_cached_charts(cache_key, cached)
+        if cached is not None:
+            self.log("Cache hit for %s", cache_key)
+            self._touch_cache(cache_key)
+            return cached
+
         data_agent = DataIntakeAgent(self.session, self.memory)
         analytics_agent = AnalyticsAgent(self.session, self.memory)
         insight_agent = InsightWriterAgent(self.session, self.memory)
 
-        profile = data_agent.load_and_profile_csv(filepath)
+        profile = data_agent.load_and_profile_csv(
+            io.BytesIO(data), columns_of_interest=AnalyticsAgent.REQUIRED_COLUMNS
+        )
         analytics = analytics_agent.compute_kpis()
+
+        # The narrative only needs profile + KPI scalars, so release the
+        # frame now — peak RSS becomes max(phase footprint), not the sum.
+        self.session.consume("dataframe")
+        self.session.consume("arrow_table")
+        gc.collect()
+
         narrative = insight_agent.generate_insights()
 
         output = {
@@ -221,9 +727,72 @@ class OrchestratorAgent(BaseAgent):
             "narrative": narrative
         }
 
+        # KPI failures propagate before this point, so only sound results
+        # reach the cache — and one with a chart is cached only once the
+        # background render succeeds, never pinning a dead chart URL.
+        chart_future = self.session.consume("chart_future")
+        if chart_future is None:
+            self._remember_result(cache_key, output)
+        else:
+            def _cache_if_rendered(fut):
+                if not fut.cancelled() and fut.exception() is None and fut.result():
+                    self._remember_result(cache_key, output)
+
+            chart_future.add_done_callback(_cache_if_rendered)
+
         self.log("Pipeline complete.")
         return output
 
+    @staticmethod
+    def _read_bytes(source) -> bytes:
+        if hasattr(source, "read"):
+            _rewind(source)
+            return source.read()
+        with open(source, "rb") as f:
+            return f.read()
+
+    def _remember_result(self, cache_key: str, output: Dict[str, Any]):
+        """Store a pipeline result and evict the least-recently-used entries."""
+        self.memory.set(cache_key, output)
+        self._touch_cache(cache_key)
+
+    def _touch_cache(self, cache_key: str):
+        index = self.memory.get("cache_index", [])
+        if cache_key in index:
+            index.remove(cache_key)
+        index.append(cache_key)
+        for stale in index[:-self.CACHE_LIMIT]:
+            self._drop_cached_result(stale)
+        self.memory.set("cache_index", index[-self.CACHE_LIMIT:])
+
+    def _refresh_cached_charts(self, cache_key: str, cached: Dict[str, Any]):
+        """Reconcile a cached result's charts with what is actually on disk.
+
+        The snapshot was taken at submit time, so its status says "pending"
+        even though the render finished long ago; rewrite it from
+        get_chart_status. When the chart files are gone entirely (the TTL
+        sweep outlasted the count-based cache), drop the entry and return
+        None so the caller recomputes instead of replaying a dead URL.
+        """
+        for chart in cached.get("charts", {}).values():
+            if not (isinstance(chart, dict) and "chart_id" in chart):
+                continue
+            status, _ = get_chart_status(chart["chart_id"])
+            if status not in ("ready", "pending"):
+                self._drop_cached_result(cache_key)
+                return None
+            chart["status"] = status
+        return cached
+
+    def _drop_cached_result(self, cache_key: str):
+        """Delete an evicted result along with any chart artifacts it references."""
+        entry = self.memory.get(cache_key)
+        if entry:
+            for chart in entry.get("charts", {}).values():
+                if isinstance(chart, dict) and "chart_id" in chart:
+                    _remove_chart_artifacts(chart["chart_id"])
+        self.memory.delete(cache_key)
+
 
 # ---------------------------------------------------------
 # Demo Runner
@@ -244,9 +813,8 @@ def generate_demo_csv() -> str:
 if __name__ == "__main__":
     print("Running InsightFlow demo...\n")
 
-    session = SessionState()
     memory = LongTermMemory()
-    orch = OrchestratorAgent(session, memory)
+    orch = OrchestratorAgent(memory)
 
     csv_path = generate_demo_csv()
     results = orch.process_file(csv_path)
@@ -260,4 +828,4 @@ if __name__ == "__main__":
     print("\n=== NARRATIVE ===")
     print(results["narrative"])
 
-    print("\nCharts stored in:", results["charts"])
+    print("\nCharts:", json.dumps(results["charts"], indent=2))
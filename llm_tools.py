@@ -8,32 +8,183 @@ LLM wrapper for InsightFlow.
 
 import os
 import json
+import asyncio
+import hashlib
 import logging
+from collections import OrderedDict
+from itertools import islice
 from typing import Optional
 
+try:
+    import aiohttp
+except ImportError:  # only needed once a real provider call is plugged in
+    aiohttp = None
+
 logger = logging.getLogger("InsightFlow.LLM")
 logger.setLevel(logging.INFO)
 
-def call_llm_generate(prompt: str, model: str = "gemini", max_tokens: int = 512) -> str:
+# Prompt-hash LRU: identical prompts (debug sessions, CI, demo re-runs)
+# return in O(1) without touching the network.
+_RESPONSE_CACHE = OrderedDict()
+_RESPONSE_CACHE_SIZE = 1024
+
+# Shared aiohttp session, created lazily and keyed to its event loop: each
+# asyncio.run call spins up a fresh loop, and a session bound to a closed
+# loop fails on reuse.
+_SESSION = None
+_SESSION_LOOP = None
+
+
+def _prompt_key(prompt: str, model: str, max_tokens: int) -> str:
+    digest = hashlib.blake2b(prompt.encode(), digest_size=16).hexdigest()
+    return f"llm:{model}:{max_tokens}:{digest}"
+
+
+def _remember(key: str, value: str):
+    _RESPONSE_CACHE[key] = value
+    _RESPONSE_CACHE.move_to_end(key)
+    while len(_RESPONSE_CACHE) > _RESPONSE_CACHE_SIZE:
+        _RESPONSE_CACHE.popitem(last=False)
+
+
+async def _get_session():
+    """Return the shared session for the running loop, recreating it when
+    the loop has changed or the session was closed."""
+    global _SESSION, _SESSION_LOOP
+    loop = asyncio.get_running_loop()
+    if _SESSION is None or _SESSION.closed or _SESSION_LOOP is not loop:
+        if _SESSION is not None and not _SESSION.closed:
+            try:
+                await _SESSION.close()
+            except Exception:  # the owning loop may already be gone
+                pass
+        _SESSION = aiohttp.ClientSession()
+        _SESSION_LOOP = loop
+    return _SESSION
+
+
+async def _close_session():
+    """Best-effort close of the shared session before a loop goes away."""
+    if _SESSION is not None and not _SESSION.closed:
+        try:
+            await _SESSION.close()
+        except Exception:  # a stale session's owning loop may already be gone
+            pass
+
+# How many column dtypes stay inline in the compacted context; the rest is
+# paged out to long-term memory.
+MAX_PROFILE_COLUMNS = 20
+
+
+def _estimate_tokens(text: str) -> int:
+    """Cheap chars/4 heuristic — close enough for budgeting without a tokenizer."""
+    return len(text) // 4
+
+
+def compact_context(profile: dict, kpis: dict, budget_tokens: int = 2000, memory=None) -> str:
+    """Compact profile + KPI context to a bounded token budget before an LLM call.
+
+    Wide CSVs can carry thousands of columns, and sending the full dtypes
+    dict would grow the prompt without bound. Keep the first
+    MAX_PROFILE_COLUMNS dtypes inline, page the remainder into long-term
+    memory keyed by a hash of the column list (recoverable via
+    memory_recall), and drop schema detail entirely if the result still
+    exceeds the budget.
     """
-    Lightweight wrapper to call an LLM. Replace the internals with your provider SDK.
+    profile = dict(profile)
+    dtypes = profile.get("dtypes") or {}
+    if len(dtypes) > MAX_PROFILE_COLUMNS:
+        keep = dict(islice(dtypes.items(), MAX_PROFILE_COLUMNS))
+        rest = {k: v for k, v in dtypes.items() if k not in keep}
+        if memory is not None:
+            overflow_key = "context:" + hashlib.blake2b(
+                "|".join(dtypes).encode(), digest_size=16
+            ).hexdigest()
+            memory.set(overflow_key, rest)
+            profile["dtypes_memory_key"] = overflow_key
+        profile["dtypes"] = keep
+        profile["dtypes_truncated"] = len(rest)
+        profile["columns"] = list(islice(profile.get("columns", []), MAX_PROFILE_COLUMNS))
+
+    context = {"profile": profile, "kpis": kpis}
+    text = json.dumps(context)
+    if _estimate_tokens(text) > budget_tokens:
+        # Last resort: keep only the counts and KPI scalars.
+        for key in ("dtypes", "columns"):
+            profile.pop(key, None)
+        text = json.dumps(context)
+    return text
+
+
+def memory_recall(memory, key: str):
+    """Page a compacted-out context blob back in from long-term memory."""
+    return memory.get(key)
+
+async def call_llm_generate_async(prompt: str, model: str = "gemini",
+                                  max_tokens: int = 512, memory=None) -> str:
+    """
+    Async wrapper to call an LLM. Replace the internals with your provider API.
     Uses env var GEMINI_API_KEY. If not present, returns a deterministic fallback string.
+
+    Responses are cached by prompt hash in an in-process LRU; pass a
+    LongTermMemory handle to also persist them across worker restarts.
     """
+    key = _prompt_key(prompt, model, max_tokens)
+    if key in _RESPONSE_CACHE:
+        _RESPONSE_CACHE.move_to_end(key)
+        return _RESPONSE_CACHE[key]
+    if memory is not None:
+        cached = memory.get(key)
+        if cached is not None:
+            _remember(key, cached)
+            return cached
+
     api_key = os.environ.get("GEMINI_API_KEY") or os.environ.get("OPENAI_API_KEY")
     if not api_key:
         logger.warning("No GEMINI_API_KEY/OPENAI_API_KEY found. Returning deterministic fallback.")
         # Deterministic fallback: shorten prompt and echo key high-level items
         # Keep it useful but reproducible for judges who run offline
         short = prompt[:800].replace("\n", " ")
-        return f"DETERMINISTIC FALLBACK SUMMARY: {short[:800]}"
+        result = f"DETERMINISTIC FALLBACK SUMMARY: {short[:800]}"
+    else:
+        result = await _generate_remote(prompt, model, max_tokens, api_key)
+
+    _remember(key, result)
+    if memory is not None:
+        memory.set(key, result)
+    return result
+
+
+async def _generate_remote(prompt: str, model: str, max_tokens: int, api_key: str) -> str:
+    """POST the prompt to the provider over the shared aiohttp session."""
+    if aiohttp is None:
+        raise NotImplementedError("aiohttp is required for remote LLM calls.")
+    session = await _get_session()  # noqa: F841 — used by the provider call below
 
     # Example pseudocode: replace with real provider call
     # --- PSEUDOCODE START ---
-    # from google.cloud import aiplatform
-    # client = aiplatform.gapic.PredictionServiceClient()
-    # response = client.predict(endpoint=..., instances=[{"prompt": prompt}], parameters=...)
-    # return response.predictions[0]['content']
+    # async with session.post(ENDPOINT_URL,
+    #                         headers={"Authorization": f"Bearer {api_key}"},
+    #                         json={"model": model, "prompt": prompt,
+    #                               "max_tokens": max_tokens}) as resp:
+    #     payload = await resp.json()
+    # return payload["candidates"][0]["content"]
     # --- PSEUDOCODE END ---
 
     # For safety in this repo, we don't include SDK calls or keys.
-    raise NotImplementedError("Insert your LLM provider SDK call here (Gemini/ADK/OpenAI).")
+    raise NotImplementedError("Insert your LLM provider API call here (Gemini/ADK/OpenAI).")
+
+
+def call_llm_generate(prompt: str, model: str = "gemini", max_tokens: int = 512,
+                      memory=None) -> str:
+    """Synchronous entry point for Flask callers; see call_llm_generate_async."""
+    async def _run():
+        try:
+            return await call_llm_generate_async(
+                prompt, model=model, max_tokens=max_tokens, memory=memory
+            )
+        finally:
+            # This loop dies with asyncio.run; don't leave a session bound to it.
+            await _close_session()
+
+    return asyncio.run(_run())